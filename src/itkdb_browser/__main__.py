@@ -3,6 +3,9 @@ Top-level entrypoint for the command line interface.
 """
 from __future__ import annotations
 
+from pathlib import Path
+from typing import Any, List, Optional
+
 import typer
 
 from itkdb_browser import __version__
@@ -12,7 +15,14 @@ app = typer.Typer()
 
 @app.callback(invoke_without_command=True)
 def main(
+    ctx: typer.Context,
     version: bool = typer.Option(False, "--version", help="Print the current version."),
+    refresh_interval: float = typer.Option(
+        0,
+        "--refresh-interval",
+        min=0,
+        help="Seconds between background refreshes of lists. Disabled if 0.",
+    ),
 ) -> None:
     """
     Manage top-level options
@@ -21,12 +31,157 @@ def main(
         typer.echo(f"itkdb-browser v{__version__}")
         raise typer.Exit()
 
+    if ctx.invoked_subcommand is not None:
+        return
+
     import itkdb_browser.tui  # pylint: disable=import-outside-toplevel
 
-    browser = itkdb_browser.tui.Browser()
+    browser = itkdb_browser.tui.Browser(refresh_interval=refresh_interval)
     browser.run()
 
 
+@app.command()
+def download(  # noqa: PLR0913
+    components: Optional[List[str]] = typer.Argument(  # noqa: UP006,UP007
+        None, help="Serial numbers or codes of components to download."
+    ),
+    project: str = typer.Option("P", help="Project to filter components on."),
+    component_type: Optional[str] = typer.Option(  # noqa: UP007
+        None, "--component-type", help="Component type code to filter components on."
+    ),
+    institution: Optional[str] = typer.Option(  # noqa: UP007
+        None, help="Institution code to filter components on."
+    ),
+    output: Path = typer.Option(
+        Path("components"), "--output", "-o", help="Directory to download into."
+    ),
+    workers: int = typer.Option(
+        4, "--workers", "-j", min=1, help="Number of concurrent transfers."
+    ),
+    attachments: bool = typer.Option(
+        True, help="Download attachments along with component details."
+    ),
+) -> None:
+    """
+    Download component details and attachments.
+    """
+    # pylint: disable=import-outside-toplevel
+    import itkdb
+    from rich.progress import (
+        BarColumn,
+        DownloadColumn,
+        Progress,
+        TextColumn,
+        TransferSpeedColumn,
+    )
+
+    from itkdb_browser.download import Downloader, DownloadProgress
+
+    client = itkdb.Client()
+    if not components:
+        if not (component_type or institution):
+            typer.echo("Provide components or a --component-type/--institution filter.")
+            raise typer.Exit(code=1)
+        query = {
+            key: value
+            for key, value in {
+                "project": project,
+                "componentType": component_type,
+                "institution": institution,
+            }.items()
+            if value
+        }
+        components = [
+            component["code"] for component in client.get("listComponents", json=query)
+        ]
+
+    downloader = Downloader(
+        client, output, max_workers=workers, attachments=attachments
+    )
+    with Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+    ) as progress_bar:
+        task = progress_bar.add_task("components", total=None)
+
+        def update(progress: DownloadProgress) -> None:
+            progress_bar.update(
+                task,
+                description=f"{progress.components_done}/{progress.components_total} components, {progress.files_done}/{progress.files_total} attachments",
+                completed=progress.bytes_done,
+                total=progress.bytes_total or None,
+            )
+
+        progress = downloader.download(components, callback=update)
+        update(progress)
+
+    for name, reason in progress.failures:
+        typer.echo(f"{name}: {reason}", err=True)
+    if progress.failures:
+        raise typer.Exit(code=1)
+
+
+@app.command("reorder-stages")
+def reorder_stages(
+    spec: Path = typer.Option(
+        ...,
+        "--spec",
+        exists=True,
+        dir_okay=False,
+        help="YAML file listing component types and the order of their stages.",
+    ),
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="Report the changes without sending them."
+    ),
+    workers: int = typer.Option(
+        4, "--workers", "-j", min=1, help="Number of concurrent updates."
+    ),
+    report: Optional[Path] = typer.Option(  # noqa: UP007
+        None, "--report", dir_okay=False, help="Write the JSON report to a file."
+    ),
+) -> None:
+    """
+    Reorder the stages of component types from a spec file, without the TUI.
+    """
+    # pylint: disable=import-outside-toplevel
+    import json
+
+    import itkdb
+
+    from itkdb_browser.reorder import (
+        SpecError,
+        apply_reorders,
+        plan_reorders,
+        read_spec,
+    )
+
+    client = itkdb.Client()
+    result: dict[str, Any] = {"dryRun": dry_run, "errors": [], "componentTypes": []}
+    try:
+        plans = plan_reorders(client, read_spec(spec))
+    except SpecError as exc:
+        result["errors"] = exc.errors
+    except itkdb.exceptions.ResponseException as exc:
+        result["errors"] = [str(exc)]
+    else:
+        result["componentTypes"] = apply_reorders(
+            client, plans, dry_run=dry_run, max_workers=workers
+        )
+
+    output = json.dumps(result, indent=2)
+    if report:
+        report.write_text(output + "\n", encoding="utf-8")
+    else:
+        typer.echo(output)
+
+    if result["errors"] or any(
+        entry["status"] == "failed" for entry in result["componentTypes"]
+    ):
+        raise typer.Exit(code=1)
+
+
 # for generating documentation using mkdocs-click
 typer_click_object = typer.main.get_command(app)
 
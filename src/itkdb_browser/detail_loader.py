@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable
+
+
+class DetailLoader:
+    """
+    Fetch details for list items concurrently and keep them in a size-bounded cache.
+
+    Items are dictionaries identified by ``key``. Details are fetched on a
+    bounded thread pool; the least recently used details are evicted once
+    more than ``maxsize`` are cached.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[dict[str, Any]], dict[str, Any]],
+        key: str = "id",
+        maxsize: int = 256,
+        max_workers: int = 4,
+    ) -> None:
+        self.fetch = fetch
+        self.key = key
+        self.maxsize = maxsize
+        self._cache: OrderedDict[Any, dict[str, Any]] = OrderedDict()
+        self._pending: dict[Any, Future[dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="details"
+        )
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, item: dict[str, Any]) -> bool:
+        return item[self.key] in self._cache
+
+    def get(self, item: dict[str, Any]) -> dict[str, Any] | None:
+        """Return the cached details for an item, if any."""
+        with self._lock:
+            key = item[self.key]
+            if key not in self._cache:
+                return None
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+    def load(self, item: dict[str, Any]) -> Future[dict[str, Any]]:
+        """Return a future for the details of an item, fetching them if not cached or in flight."""
+        key = item[self.key]
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                future: Future[dict[str, Any]] = Future()
+                future.set_result(self._cache[key])
+                return future
+            if key in self._pending and not self._pending[key].cancelled():
+                return self._pending[key]
+            future = Future()
+            self._pending[key] = future
+        self._executor.submit(self._fetch, key, item, future)
+        return future
+
+    def prefetch(self, items: Iterable[dict[str, Any]]) -> None:
+        """
+        Queue a batch of items to fetch, in priority order.
+
+        Queued fetches for items outside of the batch that have not started
+        yet are dropped, so that the pool keeps up with a moving cursor.
+        """
+        items = list(items)
+        keys = {item[self.key] for item in items}
+        with self._lock:
+            stale = [future for key, future in self._pending.items() if key not in keys]
+        for future in stale:
+            future.cancel()
+        for item in items:
+            self.load(item)
+
+    def invalidate(self, keys: Iterable[Any]) -> None:
+        """Forget cached or in-flight details, e.g. after the item changed remotely."""
+        with self._lock:
+            for key in keys:
+                self._cache.pop(key, None)
+                self._pending.pop(key, None)
+
+    def shutdown(self) -> None:
+        """Drop queued fetches and stop the worker threads."""
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            future.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _fetch(
+        self, key: Any, item: dict[str, Any], future: Future[dict[str, Any]]
+    ) -> None:
+        """Fetch details in a worker thread, caching them before resolving ``future``."""
+        if not future.set_running_or_notify_cancel():
+            self._forget(key, future)
+            return
+        try:
+            details = self.fetch(item)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self._forget(key, future)
+            future.set_exception(exc)
+            return
+
+        with self._lock:
+            # only cache if not invalidated while the fetch was in flight
+            if self._pending.get(key) is future:
+                del self._pending[key]
+                self._cache[key] = details
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+        future.set_result(details)
+
+    def _forget(self, key: Any, future: Future[dict[str, Any]]) -> None:
+        """Drop ``future`` from the in-flight fetches if it is still the current one."""
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
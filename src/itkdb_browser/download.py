@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import closing
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import itkdb
+
+CHUNK_SIZE = 512 * 1024
+
+
+class DownloadCancelled(Exception):
+    """Raised inside a transfer when the download has been cancelled."""
+
+
+class DownloadProgress:
+    """Thread-safe aggregate progress over all transfers of a download."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.components_total = 0
+        self.components_done = 0
+        self.files_total = 0
+        self.files_done = 0
+        self.bytes_total = 0
+        self.bytes_done = 0
+        self.bytes_transferred = 0
+        self.failures: list[tuple[str, str]] = []
+
+    def add_components(self, count: int) -> None:
+        """Register components that are going to be downloaded."""
+        with self._lock:
+            self.components_total += count
+
+    def finish_component(self) -> None:
+        """Mark the details of a component as downloaded."""
+        with self._lock:
+            self.components_done += 1
+
+    def add_file(self) -> None:
+        """Register an attachment that is going to be downloaded."""
+        with self._lock:
+            self.files_total += 1
+
+    def finish_file(self) -> None:
+        """Mark an attachment as downloaded."""
+        with self._lock:
+            self.files_done += 1
+
+    def add_bytes(self, total: int, done: int = 0) -> None:
+        """Register the size of a transfer, and how much of it is already on disk."""
+        with self._lock:
+            self.bytes_total += total
+            self.bytes_done += done
+
+    def advance(self, nbytes: int) -> None:
+        """Account for a chunk received and written to disk."""
+        with self._lock:
+            self.bytes_done += nbytes
+            self.bytes_transferred += nbytes
+
+    def fail(self, name: str, exc: BaseException) -> None:
+        """Record a failed component or attachment."""
+        with self._lock:
+            self.failures.append((name, str(exc)))
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the download started."""
+        return time.monotonic() - self.started
+
+    @property
+    def throughput(self) -> float:
+        """
+        Average number of bytes per second transferred so far.
+
+        Files skipped or resumed from an earlier download only count for what
+        was actually received in this one.
+        """
+        elapsed = self.elapsed
+        return self.bytes_transferred / elapsed if elapsed > 0 else 0.0
+
+
+class Downloader:
+    """
+    Download component details and attachments concurrently into a directory.
+
+    Component details are written to ``<output>/<component>/component.json``
+    and attachments next to them as ``<attachment code>_<filename>``. Bodies
+    are streamed to a ``.part`` file in chunks and renamed when complete, so
+    an interrupted download resumes from where it stopped.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        client: itkdb.Client,
+        output: Path | str,
+        *,
+        max_workers: int = 4,
+        attachments: bool = True,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> None:
+        self.client = client
+        self.output = Path(output)
+        self.max_workers = max_workers
+        self.attachments = attachments
+        self.chunk_size = chunk_size
+        self.progress = DownloadProgress()
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Stop all transfers at the next chunk boundary."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the download has been cancelled."""
+        return self._cancelled.is_set()
+
+    def download(
+        self,
+        components: Iterable[str],
+        callback: Callable[[DownloadProgress], None] | None = None,
+        interval: float = 0.25,
+    ) -> DownloadProgress:
+        """
+        Download the given components with a bounded pool of worker threads.
+
+        Args:
+            components: Serial numbers or codes of the components to download.
+            callback: Called with the aggregate progress every ``interval`` seconds.
+            interval: Seconds between calls of ``callback``.
+
+        Returns:
+            The final aggregate progress, including any failures.
+        """
+        components = list(components)
+        self.progress.add_components(len(components))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending: dict[Future[Any], str] = {
+                pool.submit(self.fetch_component, component): component
+                for component in components
+            }
+            try:
+                while pending:
+                    done, _ = wait(
+                        pending, timeout=interval, return_when=FIRST_COMPLETED
+                    )
+                    for future in done:
+                        self._collect(pool, pending, future)
+                    if callback:
+                        callback(self.progress)
+            except KeyboardInterrupt:
+                self.cancel()
+                raise
+        return self.progress
+
+    def _collect(
+        self,
+        pool: ThreadPoolExecutor,
+        pending: dict[Future[Any], str],
+        future: Future[Any],
+    ) -> None:
+        """Handle a finished transfer, queueing the attachments of a component."""
+        name = pending.pop(future)
+        try:
+            result = future.result()
+        except DownloadCancelled:
+            return
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self.progress.fail(name, exc)
+            return
+        if not isinstance(result, dict) or not self.attachments:
+            return
+        for attachment in result.get("attachments") or []:
+            self.progress.add_file()
+            transfer = pool.submit(self.fetch_attachment, name, result, attachment)
+            pending[transfer] = f"{name}/{attachment.get('code', '?')}"
+
+    def fetch_component(self, component: str) -> dict[str, Any]:
+        """Fetch the details of a component and write them to disk."""
+        if self.cancelled:
+            raise DownloadCancelled(component)
+        details: dict[str, Any] = self.client.get(
+            "getComponent", json={"component": component}
+        )
+        directory = self.output / component
+        directory.mkdir(parents=True, exist_ok=True)
+        partial = directory / "component.json.part"
+        with partial.open("w", encoding="utf-8") as fp:
+            json.dump(details, fp, indent=2)
+        partial.replace(directory / "component.json")
+        self.progress.finish_component()
+        return details
+
+    def fetch_attachment(
+        self, name: str, component: dict[str, Any], attachment: dict[str, Any]
+    ) -> Path:
+        """Stream an attachment of a component to disk, resuming a partial transfer."""
+        filename = Path(attachment.get("filename") or attachment["code"]).name
+        destination = self.output / name / f"{attachment['code']}_{filename}"
+        if destination.exists():
+            size = destination.stat().st_size
+            self.progress.add_bytes(size, size)
+            self.progress.finish_file()
+            return destination
+
+        params: dict[str, Any]
+        if attachment.get("type") == "eos":
+            url = attachment["url"]
+            params = {"verify": itkdb.data / "CERN_chain.pem"}
+        else:
+            url = "getComponentAttachment"
+            params = {
+                "json": {"component": component["code"], "code": attachment["code"]}
+            }
+        self.stream(url, destination, **params)
+        self.progress.finish_file()
+        return destination
+
+    def stream(self, url: str, destination: Path, **kwargs: Any) -> None:
+        """Stream a response body to ``destination`` in chunks, resuming from a ``.part`` file."""
+        partial = destination.with_name(f"{destination.name}.part")
+        offset = partial.stat().st_size if partial.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            # bypass itkdb.Client response handling which buffers the whole body
+            response = itkdb.core.Session.request(
+                self.client, "GET", url, stream=True, headers=headers, **kwargs
+            )
+        except itkdb.exceptions.ResponseException as exc:
+            if (
+                offset
+                and exc.response.status_code
+                == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+            ):
+                # the partial file already holds the entire body
+                self.progress.add_bytes(offset, offset)
+                partial.replace(destination)
+                return
+            raise
+
+        with closing(response):
+            if response.status_code != HTTPStatus.PARTIAL_CONTENT:
+                offset = 0
+            length = int(response.headers.get("content-length") or 0)
+            self.progress.add_bytes(offset + length, offset)
+            with partial.open("ab" if offset else "wb") as fp:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if self.cancelled:
+                        raise DownloadCancelled(destination.name)
+                    fp.write(chunk)
+                    self.progress.advance(len(chunk))
+        partial.replace(destination)
@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import asyncio
+from operator import itemgetter
+from typing import Any, ClassVar, Iterable, NamedTuple
+
+from textual import events, work
+from textual.binding import BindingType
+from textual.message import Message
+from textual.widgets import Label, ListItem, ListView
+from textual.worker import Worker, WorkerState
+
+from itkdb_browser.detail_loader import DetailLoader
+
+
+class ListDelta(NamedTuple):
+    """The keyed difference between two lists of dictionaries."""
+
+    added: dict[Any, dict[str, Any]]
+    removed: dict[Any, dict[str, Any]]
+    changed: dict[Any, dict[str, Any]]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def diff_by_key(
+    old: Iterable[dict[str, Any]], new: Iterable[dict[str, Any]], key: str = "id"
+) -> ListDelta:
+    """
+    Compute the keyed difference between two lists of dictionaries.
+
+    Args:
+        old: The current list of items.
+        new: The freshly fetched list of items.
+        key: The dictionary key identifying an item across both lists.
+
+    Returns:
+        The items only in ``new`` (added), only in ``old`` (removed), and in
+        both but with different content (changed, holding the new values).
+    """
+    old_items = {item[key]: item for item in old}
+    new_items = {item[key]: item for item in new}
+    return ListDelta(
+        added={k: v for k, v in new_items.items() if k not in old_items},
+        removed={k: v for k, v in old_items.items() if k not in new_items},
+        changed={
+            k: v for k, v in new_items.items() if k in old_items and old_items[k] != v
+        },
+    )
+
+
+class LiveListItem(ListItem):
+    """A ListItem displaying a dictionary by one of its keys, storing the dictionary on itself."""
+
+    def __init__(self, item: dict[str, Any], label_key: str = "name"):
+        super().__init__(Label(item[label_key]))
+        self.label_key = label_key
+        self.value = item
+
+    def update_value(self, item: dict[str, Any]) -> None:
+        """Replace the stored dictionary in place and mark the row as changed."""
+        self.value = item
+        self.query_one(Label).update(item[self.label_key])
+        self.add_class("-changed")
+
+
+class LiveListView(ListView):
+    """
+    A ListView that can re-fetch its items in the background and patch itself in place.
+
+    Subclasses implement :meth:`fetch_items`. Rows are matched between fetches
+    by ``item_key`` so that the highlighted row and scroll position survive a
+    refresh.
+    """
+
+    DEFAULT_CSS = """
+    LiveListView > LiveListItem.-changed {
+        background: $warning 30%;
+    }
+    """
+
+    BINDINGS: ClassVar[list[BindingType]] = [
+        ("r", "refresh_items", "Refresh"),
+    ]
+
+    item_key = "id"
+    label_key = "name"
+
+    class Patched(Message):
+        """Sent when a background refresh has been applied to the list."""
+
+        def __init__(self, list_view: LiveListView, delta: ListDelta) -> None:
+            self.list_view = list_view
+            self.delta = delta
+            super().__init__()
+
+        @property
+        def control(self) -> LiveListView:
+            """The LiveListView that was patched."""
+            return self.list_view
+
+    def __init__(self, *args: Any, refresh_interval: float = 0, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.refresh_interval = refresh_interval
+
+    def fetch_items(self) -> list[dict[str, Any]]:
+        """Fetch the current list of items. Runs in a worker thread."""
+        msg = f"{type(self).__name__} must implement fetch_items"
+        raise NotImplementedError(msg)
+
+    @property
+    def items(self) -> list[dict[str, Any]]:
+        """The values currently displayed, in display order."""
+        return [
+            child.value for child in self.children if isinstance(child, LiveListItem)
+        ]
+
+    def make_item(self, item: dict[str, Any]) -> LiveListItem:
+        """Create the list item used to display a single value."""
+        return LiveListItem(item, label_key=self.label_key)
+
+    def sort_items(self, items: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Return items in display order."""
+        return sorted(items, key=itemgetter(self.label_key))
+
+    def _on_mount(self, _: events.Mount) -> None:
+        # ListView._on_mount is dispatched separately, along the MRO
+        if self.refresh_interval > 0:
+            self.set_interval(self.refresh_interval, self.action_refresh_items)
+
+    def watch_index(self, old_index: int | None, new_index: int | None) -> None:
+        """Clear the changed marker once the row has been looked at."""
+        super().watch_index(old_index, new_index)
+        highlighted = self.highlighted_child
+        if highlighted is not None:
+            highlighted.remove_class("-changed")
+
+    def action_refresh_items(self) -> None:
+        """Re-fetch the items in the background."""
+        self.refresh_items()
+
+    @work(thread=True, exclusive=True, exit_on_error=False, group="refresh")
+    def refresh_items(self) -> None:
+        """Fetch the items in a worker thread and patch the list with the result."""
+        items = self.fetch_items()
+        self.app.call_from_thread(self.schedule_patch, items)
+
+    def schedule_patch(self, items: list[dict[str, Any]]) -> None:
+        """Queue a patch of the list, so that patches are applied one at a time."""
+        self.call_later(self.patch_items, items)
+
+    def on_worker_state_changed(self, event: Worker.StateChanged) -> None:
+        """Report a failed background refresh without tearing down the app."""
+        if event.worker.group == "refresh" and event.state == WorkerState.ERROR:
+            self.notify(
+                f"Refreshing failed: {event.worker.error}",
+                severity="error",
+            )
+
+    async def patch_items(self, items: list[dict[str, Any]]) -> ListDelta:
+        """
+        Patch the displayed rows to match ``items`` without rebuilding the list.
+
+        Removed rows are dropped, changed rows are updated in place and
+        highlighted, and added rows are mounted at their sorted position.
+        """
+        delta = diff_by_key(self.items, items, key=self.item_key)
+        if not delta:
+            return delta
+
+        highlighted = self.highlighted_child
+        highlighted_key = (
+            highlighted.value[self.item_key]
+            if isinstance(highlighted, LiveListItem)
+            else None
+        )
+        scroll_y = self.scroll_y
+
+        rows = {
+            child.value[self.item_key]: child
+            for child in self.children
+            if isinstance(child, LiveListItem)
+        }
+        for key in delta.removed:
+            await rows.pop(key).remove()
+        for key, value in delta.changed.items():
+            rows[key].update_value(value)
+        await self._arrange_rows(rows, items)
+
+        self._restore_highlight(rows.get(highlighted_key))
+        self.call_after_refresh(self.scroll_to, y=scroll_y, animate=False)
+        self.post_message(self.Patched(self, delta))
+        return delta
+
+    async def _arrange_rows(
+        self, rows: dict[Any, LiveListItem], items: list[dict[str, Any]]
+    ) -> None:
+        """Move existing rows and mount new ones so the list follows sorted order."""
+        for position, value in enumerate(self.sort_items(items)):
+            key = value[self.item_key]
+            if key in rows:
+                if self.children[position] is not rows[key]:
+                    self.move_child(rows[key], before=position)
+                continue
+            rows[key] = self.make_item(value)
+            rows[key].add_class("-changed")
+            if position < len(self.children):
+                await self.mount(rows[key], before=position)
+            else:
+                await self.mount(rows[key])
+
+    def _restore_highlight(self, highlighted: LiveListItem | None) -> None:
+        """Keep the cursor on the previously highlighted row, wherever it moved."""
+        new_index = None
+        if highlighted is not None:
+            new_index = self.children.index(highlighted)
+        elif len(self.children):
+            new_index = self._clamp_index(self.index or 0)
+        if new_index != self.index:
+            self.index = new_index
+        for position, child in enumerate(self.children):
+            if isinstance(child, ListItem):
+                child.highlighted = position == self.index
+
+
+class DetailedLiveListView(LiveListView):
+    """
+    A LiveListView that also fetches the full details of its items ahead of the cursor.
+
+    Subclasses implement :meth:`fetch_details` as well. Details of the
+    highlighted row and its neighbours are fetched into ``details`` and
+    announced with :class:`DetailsLoaded`.
+    """
+
+    detail_cache_size = 256
+
+    class DetailsLoaded(Message):
+        """Sent when the details of the highlighted row are available."""
+
+        def __init__(
+            self,
+            list_view: DetailedLiveListView,
+            item: LiveListItem,
+            details: dict[str, Any],
+        ) -> None:
+            self.list_view = list_view
+            self.item = item
+            self.details = details
+            super().__init__()
+
+        @property
+        def control(self) -> DetailedLiveListView:
+            """The DetailedLiveListView the details were loaded for."""
+            return self.list_view
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.details = DetailLoader(
+            self.fetch_details, key=self.item_key, maxsize=self.detail_cache_size
+        )
+
+    def fetch_details(self, item: dict[str, Any]) -> dict[str, Any]:
+        """Fetch the full details of a single item. Runs in a worker thread."""
+        msg = f"{type(self).__name__} must implement fetch_details to load {item[self.item_key]!r}"
+        raise NotImplementedError(msg)
+
+    def _on_unmount(self) -> None:
+        # Widget._on_unmount is dispatched separately, along the MRO
+        self.details.shutdown()
+
+    def watch_index(self, old_index: int | None, new_index: int | None) -> None:
+        """Load the details of the highlighted row and prefetch those around it."""
+        super().watch_index(old_index, new_index)
+        highlighted = self.highlighted_child
+        if isinstance(highlighted, LiveListItem):
+            index = new_index or 0
+            self.details.prefetch(
+                self.neighbours(index, backwards=index < (old_index or 0))
+            )
+            self.wait_for_details(highlighted)
+
+    def neighbours(self, index: int, backwards: bool = False) -> list[dict[str, Any]]:
+        """
+        Return the values around ``index`` in the order their details should be fetched.
+
+        That is the row itself, then a viewport worth of rows in the direction
+        the cursor is moving, then half a viewport behind it.
+        """
+        window = max(self.size.height, 1)
+        step = -1 if backwards else 1
+        ahead = range(index + step, index + step * (window + 1), step)
+        behind = range(index - step, index - step * (window // 2 + 1), -step)
+        return [
+            self.children[position].value
+            for position in (index, *ahead, *behind)
+            if 0 <= position < len(self.children)
+            and isinstance(self.children[position], LiveListItem)
+        ]
+
+    @work(exclusive=True, exit_on_error=False, group="details")
+    async def wait_for_details(self, item: LiveListItem) -> None:
+        """Wait for the details of a row and announce them."""
+        # shield the shared future so that moving on does not cancel a prefetch
+        details = await asyncio.shield(
+            asyncio.wrap_future(self.details.load(item.value))
+        )
+        self.post_message(self.DetailsLoaded(self, item, details))
+
+    def on_worker_state_changed(self, event: Worker.StateChanged) -> None:
+        """Report a failed details load without tearing down the app."""
+        if event.worker.group == "details" and event.state == WorkerState.ERROR:
+            self.notify(
+                f"Loading details failed: {event.worker.error}",
+                severity="warning",
+            )
+
+    async def patch_items(self, items: list[dict[str, Any]]) -> ListDelta:
+        """
+        Forget the details of changed or removed items, then patch the rows.
+
+        The details of the highlighted row are reloaded if it changed, since
+        the cursor did not move to trigger that.
+        """
+        # invalidate first, so that restoring the highlight does not reuse stale details
+        stale = diff_by_key(self.items, items, key=self.item_key)
+        self.details.invalidate([*stale.changed, *stale.removed])
+        delta = await super().patch_items(items)
+        highlighted = self.highlighted_child
+        if (
+            isinstance(highlighted, LiveListItem)
+            and highlighted.value[self.item_key] in delta.changed
+        ):
+            self.wait_for_details(highlighted)
+        return delta
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable
+
+import itkdb
+import yaml
+
+from itkdb_browser.stage_compare import sorted_stages
+
+
+class SpecError(ValueError):
+    """Raised when a stage reorder spec is invalid."""
+
+    def __init__(self, errors: list[str]):
+        self.errors = errors
+        super().__init__("\n".join(errors))
+
+
+def build_stages(stages: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Build the stages payload of updateComponentType, numbering the stages in the given order."""
+    return [
+        {
+            "code": stage["code"],
+            "name": stage["name"],
+            "order": new_order,
+            "testTypes": stage["testTypes"],
+        }
+        for new_order, stage in enumerate(stages, start=1)
+    ]
+
+
+def build_payload(
+    component_type: dict[str, Any], stages: Iterable[dict[str, Any]]
+) -> dict[str, Any]:
+    """Build the updateComponentType payload for a component type with its stages in the given order."""
+    return {
+        "id": component_type["id"],
+        "code": component_type["code"],
+        "project": component_type["project"]["code"],
+        "stages": build_stages(stages),
+    }
+
+
+def stage_changes(stages: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """The stages whose order changes when put in the given order."""
+    return [
+        {
+            "code": stage["code"],
+            "name": stage["name"],
+            "from": stage["order"],
+            "to": new_order,
+        }
+        for new_order, stage in enumerate(stages, start=1)
+        if stage["order"] != new_order
+    ]
+
+
+def read_spec(path: Path | str) -> list[dict[str, Any]]:
+    """
+    Read a stage reorder spec into a list of ``{project, code, stages}`` entries.
+
+    The spec is a YAML (or JSON) mapping like::
+
+        project: S
+        stages: [STAGE_A, STAGE_B]
+        componentTypes:
+          - MODULE
+          - code: SENSOR
+            project: P
+            stages: [STAGE_B, STAGE_A]
+
+    where ``project`` and ``stages`` at the top level are the defaults for
+    component types that do not set their own.
+    """
+    with Path(path).open(encoding="utf-8") as fp:
+        try:
+            spec = yaml.safe_load(fp)
+        except yaml.YAMLError as exc:
+            raise SpecError([f"the spec is not valid YAML: {exc}"]) from exc
+
+    if not isinstance(spec, dict) or not isinstance(spec.get("componentTypes"), list):
+        msg = "the spec must be a mapping with a 'componentTypes' list"
+        raise SpecError([msg])
+
+    entries = []
+    errors = []
+    seen = set()
+    for position, item in enumerate(spec["componentTypes"], start=1):
+        entry = {"code": item} if isinstance(item, str) else item
+        if not isinstance(entry, dict) or not isinstance(entry.get("code"), str):
+            errors.append(
+                f"componentTypes[{position}]: expected a code or a mapping with a 'code'"
+            )
+            continue
+        project = entry.get("project", spec.get("project"))
+        stages = entry.get("stages", spec.get("stages"))
+        name = f"componentTypes[{position}] ({entry['code']})"
+        if not isinstance(project, str):
+            errors.append(f"{name}: no project given")
+        elif (project, entry["code"]) in seen:
+            errors.append(f"{name}: listed more than once")
+        else:
+            seen.add((project, entry["code"]))
+        if not isinstance(stages, list) or not all(
+            isinstance(stage, str) for stage in stages
+        ):
+            errors.append(f"{name}: expected a list of stage codes")
+        elif len(set(stages)) != len(stages):
+            errors.append(f"{name}: duplicate stage codes")
+        entries.append({"project": project, "code": entry["code"], "stages": stages})
+
+    if errors:
+        raise SpecError(errors)
+    return entries
+
+
+def plan_reorders(
+    client: itkdb.Client, entries: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """
+    Look up the component types of a spec and work out the new order of their stages.
+
+    Every entry is checked before anything is returned: the component type
+    has to exist and the spec has to list exactly its stages.
+    """
+    component_types: dict[str, dict[str, dict[str, Any]]] = {}
+    for project in sorted({entry["project"] for entry in entries}):
+        component_types[project] = {
+            component_type["code"]: component_type
+            for component_type in client.get(
+                "listComponentTypes", json={"project": project}
+            )
+        }
+
+    plans = []
+    errors = []
+    for entry in entries:
+        name = f"{entry['project']}/{entry['code']}"
+        component_type = component_types[entry["project"]].get(entry["code"])
+        if component_type is None:
+            errors.append(f"{name}: no such component type")
+            continue
+        stages = {stage["code"]: stage for stage in sorted_stages(component_type)}
+        unknown = [code for code in entry["stages"] if code not in stages]
+        missing = [code for code in stages if code not in entry["stages"]]
+        if unknown:
+            errors.append(f"{name}: unknown stages {', '.join(unknown)}")
+        if missing:
+            errors.append(f"{name}: stages missing from the spec {', '.join(missing)}")
+        if unknown or missing:
+            continue
+        ordered = [stages[code] for code in entry["stages"]]
+        plans.append(
+            {
+                "project": entry["project"],
+                "code": entry["code"],
+                "changes": stage_changes(ordered),
+                "payload": build_payload(component_type, ordered),
+            }
+        )
+
+    if errors:
+        raise SpecError(errors)
+    return plans
+
+
+def apply_reorders(
+    client: itkdb.Client,
+    plans: list[dict[str, Any]],
+    dry_run: bool = False,
+    max_workers: int = 4,
+) -> list[dict[str, Any]]:
+    """
+    Send the planned updates for the component types whose stage order changes.
+
+    Returns one report entry per plan with a ``status`` of ``unchanged``,
+    ``dry-run``, ``updated`` or ``failed``.
+    """
+
+    def apply(plan: dict[str, Any]) -> dict[str, Any]:
+        result = {
+            "project": plan["project"],
+            "code": plan["code"],
+            "changes": plan["changes"],
+        }
+        if not plan["changes"]:
+            return {**result, "status": "unchanged"}
+        if dry_run:
+            return {**result, "status": "dry-run"}
+        try:
+            client.post("updateComponentType", json=plan["payload"])
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            return {**result, "status": "failed", "error": str(exc)}
+        return {**result, "status": "updated"}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(apply, plans))
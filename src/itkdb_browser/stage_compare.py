@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from difflib import SequenceMatcher
+from operator import itemgetter
+from typing import Any, Dict, Optional, Tuple
+
+#: A row of the alignment: the stage code and the matching stage (or None) per component type
+AlignedRow = Tuple[str, Tuple[Optional[Dict[str, Any]], ...]]
+
+
+def sorted_stages(component_type: dict[str, Any]) -> list[dict[str, Any]]:
+    """The stages of a component type in their configured order."""
+    return sorted(component_type.get("stages", []) or [], key=itemgetter("order"))
+
+
+def stage_test_types(stage: dict[str, Any]) -> list[str | None]:
+    """The codes of the test types of a stage, whether given as codes or nested objects."""
+    codes: list[str | None] = []
+    for entry in stage.get("testTypes", []) or []:
+        test_type = entry.get("testType", entry) if isinstance(entry, dict) else entry
+        codes.append(
+            test_type.get("code") if isinstance(test_type, dict) else test_type
+        )
+    return codes
+
+
+def merge_stages(
+    rows: list[AlignedRow], columns: int, stages: list[dict[str, Any]]
+) -> list[AlignedRow]:
+    """
+    Align one more list of stages against an existing alignment of ``columns`` component types.
+
+    Stages are matched by code with a longest-matching-block diff, so stages
+    shared by the component types line up on the same row while the relative
+    order of every component type is kept.
+    """
+    matcher = SequenceMatcher(
+        None, [code for code, _ in rows], [stage["code"] for stage in stages], False
+    )
+    merged: list[AlignedRow] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            merged.extend(
+                (code, (*cells, stage))
+                for (code, cells), stage in zip(rows[i1:i2], stages[j1:j2])
+            )
+            continue
+        merged.extend((code, (*cells, None)) for code, cells in rows[i1:i2])
+        merged.extend(
+            (stage["code"], (*([None] * columns), stage)) for stage in stages[j1:j2]
+        )
+    return merged
+
+
+class StageAlignment:
+    """
+    Progressive alignment of the stages of several component types.
+
+    The alignment after each added component type is kept, so adding a
+    component type costs a single merge and updating or removing one only
+    redoes the merges from its position onwards.
+    """
+
+    def __init__(self) -> None:
+        self.component_types: list[dict[str, Any]] = []
+        self._steps: list[list[AlignedRow]] = []
+
+    def __len__(self) -> int:
+        return len(self.component_types)
+
+    def __contains__(self, component_type: dict[str, Any]) -> bool:
+        return self.index(component_type) is not None
+
+    @property
+    def rows(self) -> list[AlignedRow]:
+        """The aligned rows of stages, one cell per component type."""
+        return self._steps[-1] if self._steps else []
+
+    def index(self, component_type: dict[str, Any]) -> int | None:
+        """The column of a component type, matched by id."""
+        for index, existing in enumerate(self.component_types):
+            if existing["id"] == component_type["id"]:
+                return index
+        return None
+
+    def add(self, component_type: dict[str, Any]) -> None:
+        """Add a component type as the last column."""
+        self._steps.append(
+            merge_stages(
+                self.rows, len(self.component_types), sorted_stages(component_type)
+            )
+        )
+        self.component_types.append(component_type)
+
+    def update(self, component_type: dict[str, Any]) -> bool:
+        """
+        Replace a component type, e.g. once its full details are available.
+
+        Returns whether its stages changed and the alignment was redone.
+        """
+        index = self.index(component_type)
+        if index is None:
+            return False
+        existing = self.component_types[index]
+        self.component_types[index] = component_type
+        if existing is component_type or sorted_stages(existing) == sorted_stages(
+            component_type
+        ):
+            return False
+        self._realign(index)
+        return True
+
+    def remove(self, component_type: dict[str, Any]) -> None:
+        """Remove the column of a component type."""
+        index = self.index(component_type)
+        if index is None:
+            return
+        del self.component_types[index]
+        self._realign(index)
+
+    def _realign(self, start: int) -> None:
+        """Redo the merges from column ``start`` onwards."""
+        del self._steps[start:]
+        for columns in range(start, len(self.component_types)):
+            self._steps.append(
+                merge_stages(
+                    self.rows, columns, sorted_stages(self.component_types[columns])
+                )
+            )
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 from operator import itemgetter
+from pathlib import Path
 from typing import Any, Callable, ClassVar
 
 import itkdb
+from rich.filesize import decimal
+from rich.markup import escape
 from rich.pretty import Pretty
 from rich.text import Text
+from textual import work
 from textual.app import App, ComposeResult
 from textual.binding import BindingType
 from textual.containers import Container, Horizontal, Vertical
@@ -13,17 +17,29 @@ from textual.reactive import reactive
 from textual.screen import Screen
 from textual.widgets import (
     Button,
+    DataTable,
     Footer,
     Header,
     Input,
-    Label,
-    ListItem,
     ListView,
     Log,
+    ProgressBar,
+    RichLog,
+    Select,
     Static,
 )
+from textual.worker import Worker, WorkerState
 
+from itkdb_browser.download import Downloader, DownloadProgress
 from itkdb_browser.draggable_list_view import DraggableListItem, DraggableListView
+from itkdb_browser.live_list_view import (
+    DetailedLiveListView,
+    ListDelta,
+    LiveListItem,
+    LiveListView,
+)
+from itkdb_browser.reorder import build_payload
+from itkdb_browser.stage_compare import StageAlignment, stage_test_types
 
 
 class LoginScreen(Screen):
@@ -203,29 +219,38 @@ class MainScreen(Screen):
             yield UserInstitutionDetails(institution)
 
 
-class ListItemByName(ListItem):
+class ListItemByName(LiveListItem):
     """An ListItem using provided dictionary 'name' key as the display, storing value on itself."""
 
     def __init__(self, item: dict[str, Any]):
-        super().__init__(Label(item["name"]))
-        self.value = item
+        super().__init__(item, label_key="name")
 
 
-class InstitutionList(ListView):
+class InstitutionList(DetailedLiveListView):
     """A widget to display a list of institutions."""
 
     _loaded = False
 
+    def fetch_items(self) -> list[dict[str, Any]]:
+        """Get the list of institutions."""
+        return list(self.app.client.get("listInstitutions"))
+
+    def fetch_details(self, item: dict[str, Any]) -> dict[str, Any]:
+        """Get the full details of an institution."""
+        institution: dict[str, Any] = self.app.client.get(
+            "getInstitution", json={"id": item["id"]}
+        )
+        return institution
+
+    def make_item(self, item: dict[str, Any]) -> LiveListItem:
+        return ListItemByName(item)
+
     def on_mount(self) -> None:
         """Load up the institutions in the list view."""
         if not self._loaded:
             self.clear()
-            institutions = self.app.client.get("listInstitutions")
-            for institution in sorted(
-                institutions,
-                key=itemgetter("name"),
-            ):
-                self.append(ListItemByName(institution))
+            for institution in self.sort_items(self.fetch_items()):
+                self.append(self.make_item(institution))
         self._loaded = True
 
 
@@ -242,39 +267,68 @@ class InstitutionDisplay(Static):
 class InstitutionScreen(Screen):
     """Screen for displaying institutions."""
 
-    def on_list_view_selected(self, message: ListView.Selected) -> None:
-        """When institution has been chosen."""
-        self.query_one("InstitutionDisplay").institution = getattr(
-            message.item, "value", {}
-        )
+    def on_list_view_highlighted(self, message: ListView.Highlighted) -> None:
+        """When the cursor moves onto an institution, show what is known about it."""
+        institution = getattr(message.item, "value", {})
+        self.query_one("InstitutionDisplay").institution = (
+            institution and message.control.details.get(institution)
+        ) or institution
+
+    def on_detailed_live_list_view_details_loaded(
+        self, message: DetailedLiveListView.DetailsLoaded
+    ) -> None:
+        """When the full details of the highlighted institution have arrived."""
+        if message.item is message.control.highlighted_child:
+            self.query_one("InstitutionDisplay").institution = message.details
 
     def compose(self) -> ComposeResult:
         yield Header()
         yield Navigation()
         yield Footer()
         yield Horizontal(
-            InstitutionList(classes="column"),
+            InstitutionList(
+                classes="column", refresh_interval=self.app.refresh_interval
+            ),
             Vertical(InstitutionDisplay(), classes="column"),
         )
 
 
-class ComponentTypeList(ListView):
+class ComponentTypeList(DetailedLiveListView):
     """A widget to display a list of component types."""
 
     project = reactive("P", layout=True)
     _component_types: ClassVar[dict[str, list[dict[str, Any]]]] = {}
 
+    def fetch_items(self) -> list[dict[str, Any]]:
+        """Get the list of component types from the database, bypassing the cache."""
+        return list(
+            self.app.client.get("listComponentTypes", json={"project": self.project})
+        )
+
+    def fetch_details(self, item: dict[str, Any]) -> dict[str, Any]:
+        """Get the full details of a component type, including its test types."""
+        component_type: dict[str, Any] = self.app.client.get(
+            "getComponentType", json={"id": item["id"]}
+        )
+        return component_type
+
+    def make_item(self, item: dict[str, Any]) -> LiveListItem:
+        return ListItemByName(item)
+
     def get_component_types(self) -> list[dict[str, Any]]:
         """Get the list of component types."""
         if not self._component_types.get(self.project):
-            self._component_types[self.project] = sorted(
-                self.app.client.get(
-                    "listComponentTypes", json={"project": self.project}
-                ),
-                key=itemgetter("name"),
-            )
+            self._component_types[self.project] = self.sort_items(self.fetch_items())
         return self._component_types[self.project]
 
+    async def patch_items(self, items: list[dict[str, Any]]) -> ListDelta:
+        """Patch the list and keep the per-project cache in sync."""
+        if any(item["project"]["code"] != self.project for item in items):
+            # project was switched while the refresh was in flight
+            return ListDelta({}, {}, {})
+        self._component_types[self.project] = self.sort_items(items)
+        return await super().patch_items(items)
+
     def watch_project(self, old_project: str, new_project: str) -> None:
         """Update list of component types to correspond with the project."""
         if old_project != new_project:
@@ -286,7 +340,7 @@ class ComponentTypeList(ListView):
         Generate the list of component types on mount.
         """
         for component_type in self.get_component_types():
-            self.append(ListItemByName(component_type))
+            self.append(self.make_item(component_type))
 
 
 class StagesListView(DraggableListView):
@@ -308,6 +362,24 @@ class StagesListView(DraggableListView):
         """Called when the component_type attribute changes."""
         self.build_list()
 
+    @property
+    def has_pending_changes(self) -> bool:
+        """Whether the stages have been reordered locally but not saved."""
+        return [child.value["code"] for child in self.children] != [
+            stage["code"]
+            for stage in sorted(
+                self.component_type.get("stages", []) or [], key=itemgetter("order")
+            )
+        ]
+
+
+def _stage_order(component_type: dict[str, Any]) -> list[tuple[str, int]]:
+    """The (code, order) of each stage, comparable between summary and details."""
+    return sorted(
+        (stage["code"], stage["order"])
+        for stage in component_type.get("stages", []) or []
+    )
+
 
 class StageReorderScreen(Screen):
     """Screen for reordering stages on a component type."""
@@ -315,21 +387,56 @@ class StageReorderScreen(Screen):
     def on_list_view_selected(self, message: ListView.Selected) -> None:
         """When component_type has been chosen."""
         if message.control.id == "component_type_list":
-            self.query_one("StagesListView").component_type = getattr(
-                message.item, "value", {}
+            component_type = getattr(message.item, "value", {})
+            self.query_one("StagesListView").component_type = (
+                component_type and message.control.details.get(component_type)
+            ) or component_type
+
+    def on_detailed_live_list_view_details_loaded(
+        self, message: DetailedLiveListView.DetailsLoaded
+    ) -> None:
+        """When the full details of a component type have arrived, use them if it is shown."""
+        stages_lv = self.query_one("StagesListView")
+        if (
+            message.details.get("id") == stages_lv.component_type.get("id")
+            and message.details is not stages_lv.component_type
+            and not stages_lv.has_pending_changes
+        ):
+            stages_lv.component_type = message.details
+
+    def on_live_list_view_patched(self, message: LiveListView.Patched) -> None:
+        """When the component types have been refreshed in the background."""
+        stages_lv = self.query_one("StagesListView")
+        component_type = message.delta.changed.get(stages_lv.component_type.get("id"))
+        if component_type is None:
+            return
+        if not stages_lv.has_pending_changes:
+            stages_lv.component_type = component_type
+        elif _stage_order(component_type) != _stage_order(stages_lv.component_type):
+            self.app.bell()
+            self.query_one(RichLog).write(
+                Text.from_markup(
+                    f":warning: Stages of {component_type['code']} were changed remotely while you have unsaved changes. Reset to load the remote stages."
+                )
             )
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Event handler called when  button is pressed."""
         button_id = event.button.id
         stages_lv = self.query_one("StagesListView")
-        textlog = self.query_one("Log")
+        textlog = self.query_one(RichLog)
         textlog.clear()
         if button_id == "reset":
+            # pick up the latest remote version of the component type, if refreshed
+            ctype_list = self.query_one(ComponentTypeList)
+            for component_type in ctype_list.items:
+                if component_type["id"] == stages_lv.component_type.get("id"):
+                    stages_lv.component_type = (
+                        ctype_list.details.get(component_type) or component_type
+                    )
             stages_lv.build_list()
         elif button_id == "save":
             component_type = stages_lv.component_type
-            new_stages = []
             for new_order, child in enumerate(stages_lv.children, start=1):
                 stage = child.value
                 if stage["order"] != new_order:
@@ -343,21 +450,9 @@ class StageReorderScreen(Screen):
                         Text.from_markup(f"   {stage['name']}: {stage['order']}")
                     )
 
-                new_stages.append(
-                    {
-                        "code": stage["code"],
-                        "name": stage["name"],
-                        "order": new_order,
-                        "testTypes": stage["testTypes"],
-                    }
-                )
-
-            new_ctype = {
-                "id": component_type["id"],
-                "code": component_type["code"],
-                "project": component_type["project"]["code"],
-                "stages": new_stages,
-            }
+            new_ctype = build_payload(
+                component_type, [child.value for child in stages_lv.children]
+            )
             try:
                 self.app.client.post("updateComponentType", json=new_ctype)
             except itkdb.exceptions.ResponseException as exc:
@@ -370,7 +465,7 @@ class StageReorderScreen(Screen):
                 textlog.write(Text.from_markup(f"[red]{exc}[/red]"))
 
             # update stages locally
-            component_type["stages"] = new_stages
+            component_type["stages"] = new_ctype["stages"]
             stages_lv.build_list()
 
         event.stop()
@@ -379,7 +474,9 @@ class StageReorderScreen(Screen):
         yield Header()
         yield Navigation()
         yield Footer()
-        ctype_list = ComponentTypeList(id="component_type_list")
+        ctype_list = ComponentTypeList(
+            id="component_type_list", refresh_interval=self.app.refresh_interval
+        )
         ctype_list.project = self.app.user.get("preferences", {}).get(
             "defaultProject", "P"
         )
@@ -397,13 +494,238 @@ class StageReorderScreen(Screen):
                     Button("Save", variant="success", id="save"),
                     Button("Reset", variant="error", id="reset"),
                 ),
-                Log(),
+                RichLog(),
                 id="stages",
                 classes="column",
             ),
         )
 
 
+class StageComparisonScreen(Screen):
+    """Screen for comparing the stages of component types side by side."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.alignment = StageAlignment()
+
+    def on_select_changed(self, message: Select.Changed) -> None:
+        """When another project has been chosen, list its component types."""
+        if isinstance(message.value, str):
+            self.query_one(ComponentTypeList).project = message.value
+        message.stop()
+
+    def on_list_view_selected(self, message: ListView.Selected) -> None:
+        """When a component type has been chosen, add it to or remove it from the comparison."""
+        component_type = getattr(message.item, "value", {})
+        if not component_type:
+            return
+        if component_type in self.alignment:
+            self.alignment.remove(component_type)
+        else:
+            self.alignment.add(
+                message.control.details.get(component_type) or component_type
+            )
+        self.update_table()
+
+    def on_detailed_live_list_view_details_loaded(
+        self, message: DetailedLiveListView.DetailsLoaded
+    ) -> None:
+        """When the full details of a compared component type have arrived, use them."""
+        # also sent on every cursor move, so only redraw if the stages differ
+        if self.alignment.update(message.details):
+            self.update_table()
+
+    def on_live_list_view_patched(self, message: LiveListView.Patched) -> None:
+        """When the component types have been refreshed, realign the changed ones."""
+        realigned = [
+            self.alignment.update(component_type)
+            for component_type in message.delta.changed.values()
+        ]
+        if any(realigned):
+            self.update_table()
+
+    def update_table(self) -> None:
+        """Show the aligned stages, highlighting stages whose test types differ."""
+        table = self.query_one(DataTable)
+        table.clear(columns=True)
+        table.add_columns(
+            *(
+                f"{(component_type.get('project') or {}).get('code', '?')}/{component_type['code']}"
+                for component_type in self.alignment.component_types
+            )
+        )
+        for _, cells in self.alignment.rows:
+            test_types = {
+                tuple(stage_test_types(stage)) for stage in cells if stage is not None
+            }
+            style = "yellow" if len(test_types) > 1 else ""
+            table.add_row(
+                *(
+                    Text("-", style="dim")
+                    if stage is None
+                    else Text(
+                        f"{stage['order']}. {stage['name']} ({len(stage_test_types(stage))})",
+                        style=style,
+                    )
+                    for stage in cells
+                )
+            )
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Navigation()
+        yield Footer()
+        project = self.app.user.get("preferences", {}).get("defaultProject", "P")
+        ctype_list = ComponentTypeList(
+            id="compare_component_type_list",
+            refresh_interval=self.app.refresh_interval,
+        )
+        ctype_list.project = project
+        yield Horizontal(
+            Vertical(
+                Select(
+                    [
+                        (project["name"], project["code"])
+                        for project in self.app.projects
+                    ],
+                    value=project,
+                    allow_blank=False,
+                ),
+                ctype_list,
+                classes="column",
+            ),
+            Vertical(
+                Static(
+                    "Select component types to compare their stages. Stages with differing test types are highlighted.",
+                    classes="title",
+                ),
+                DataTable(zebra_stripes=True),
+                id="comparison",
+            ),
+        )
+
+
+class DownloadScreen(Screen):
+    """Screen for downloading component details and attachments."""
+
+    downloader: Downloader | None = None
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Event handler called when button is pressed."""
+        button_id = event.button.id
+        if button_id == "start":
+            if self.downloader:
+                self.downloader.cancel()
+            self.query_one(RichLog).clear()
+            self.run_download(
+                self.query_one("#components", Input).value.replace(",", " ").split(),
+                self.query_one("#component_type", Input).value.strip(),
+                self.query_one("#output", Input).value.strip() or "components",
+            )
+        elif button_id == "cancel" and self.downloader:
+            self.downloader.cancel()
+        event.stop()
+
+    @work(thread=True, exclusive=True, exit_on_error=False, group="download")
+    def run_download(
+        self, components: list[str], component_type: str, output: str
+    ) -> None:
+        """Download the components in a worker thread, reporting progress back."""
+        if not components and component_type:
+            project = self.app.user.get("preferences", {}).get("defaultProject", "P")
+            try:
+                components = [
+                    component["code"]
+                    for component in self.app.client.get(
+                        "listComponents",
+                        json={"project": project, "componentType": component_type},
+                    )
+                ]
+            except itkdb.exceptions.ResponseException as exc:
+                self.app.call_from_thread(self.app.bell)
+                self.app.call_from_thread(
+                    self.write_log, f"[red]{escape(str(exc))}[/red]"
+                )
+                return
+        if not components:
+            self.app.call_from_thread(
+                self.write_log, ":exclamation_mark: No components to download."
+            )
+            return
+
+        downloader = self.downloader = Downloader(self.app.client, output)
+        progress = downloader.download(
+            components,
+            callback=lambda progress: self.app.call_from_thread(
+                self.show_progress, progress
+            ),
+        )
+        self.app.call_from_thread(self.show_progress, progress)
+        for name, reason in progress.failures:
+            self.app.call_from_thread(
+                self.write_log,
+                f":cross_mark: {escape(name)}: [red]{escape(reason)}[/red]",
+            )
+        self.app.call_from_thread(
+            self.write_log,
+            ":stop_sign: Download cancelled."
+            if downloader.cancelled
+            else f":white_check_mark: Downloaded into {escape(str(Path(output).resolve()))}",
+        )
+
+    def on_worker_state_changed(self, event: Worker.StateChanged) -> None:
+        """Report a failed download in the log without tearing down the app."""
+        if event.worker.group == "download" and event.state == WorkerState.ERROR:
+            self.app.bell()
+            self.write_log(f":cross_mark: [red]{escape(str(event.worker.error))}[/red]")
+
+    def write_log(self, markup: str) -> None:
+        """Write a line of console markup to the log."""
+        self.query_one(RichLog).write(Text.from_markup(markup))
+
+    def show_progress(self, progress: DownloadProgress) -> None:
+        """Update the progress bar and transfer statistics."""
+        self.query_one(ProgressBar).update(
+            total=progress.bytes_total or None, progress=progress.bytes_done
+        )
+        self.query_one("#download_stats", Static).update(
+            f"{progress.components_done}/{progress.components_total} components, "
+            f"{progress.files_done}/{progress.files_total} attachments, "
+            f"{decimal(progress.bytes_done)} at {decimal(int(progress.throughput))}/s"
+        )
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Navigation()
+        yield Footer()
+        yield Vertical(
+            Horizontal(
+                Static("Components", classes="labels"),
+                Input(placeholder="serial numbers or codes", id="components"),
+                classes="input_row",
+            ),
+            Horizontal(
+                Static("Component Type", classes="labels"),
+                Input(placeholder="used if no components given", id="component_type"),
+                classes="input_row",
+            ),
+            Horizontal(
+                Static("Output", classes="labels"),
+                Input("components", id="output"),
+                classes="input_row",
+            ),
+            Horizontal(
+                Button("Download", variant="success", id="start"),
+                Button("Cancel", variant="error", id="cancel"),
+                classes="buttons",
+            ),
+            ProgressBar(show_eta=False),
+            Static(id="download_stats"),
+            RichLog(),
+            id="download",
+        )
+
+
 class Browser(App[Any]):
     """A basic implementation of the itkdb-browser TUI"""
 
@@ -419,13 +741,16 @@ class Browser(App[Any]):
         "main": MainScreen(name="main"),
         "list_institutions": InstitutionScreen(name="list_institutions"),
         "reorder_stages": StageReorderScreen(name="reorder_stages"),
+        "compare_stages": StageComparisonScreen(name="compare_stages"),
+        "download_components": DownloadScreen(name="download_components"),
     }
 
     CSS_PATH = "tui.css"
 
-    def __init__(self) -> None:
+    def __init__(self, refresh_interval: float = 0) -> None:
         super().__init__()
         self.dark = True
+        self.refresh_interval = refresh_interval
         self.client = None
         self.user: dict[str, Any] = {}
         self.projects: list[dict[str, Any]] = []
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import threading
+
+from itkdb_browser.detail_loader import DetailLoader
+
+
+def fetch(item):
+    return {**item, "details": True}
+
+
+def test_load_caches_details():
+    calls = []
+
+    def counting_fetch(item):
+        calls.append(item["id"])
+        return fetch(item)
+
+    loader = DetailLoader(counting_fetch)
+    assert loader.load({"id": 1}).result() == {"id": 1, "details": True}
+    assert loader.load({"id": 1}).result() == {"id": 1, "details": True}
+    assert loader.get({"id": 1}) == {"id": 1, "details": True}
+    assert calls == [1]
+    loader.shutdown()
+
+
+def test_cache_is_bounded():
+    loader = DetailLoader(fetch, maxsize=2)
+    for key in range(3):
+        loader.load({"id": key}).result()
+    loader.get({"id": 1})
+    loader.load({"id": 3}).result()
+
+    assert len(loader) == loader.maxsize
+    assert {"id": 1} in loader
+    assert {"id": 3} in loader
+    loader.shutdown()
+
+
+def test_prefetch_drops_stale_queued_fetches():
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_fetch(item):
+        started.set()
+        release.wait()
+        return fetch(item)
+
+    loader = DetailLoader(blocking_fetch, max_workers=1)
+    running = loader.load({"id": 0})
+    started.wait()
+    queued = loader.load({"id": 1})
+    loader.prefetch([{"id": 0}, {"id": 2}])
+    release.set()
+
+    assert queued.cancelled()
+    assert running.result() == {"id": 0, "details": True}
+    assert loader.load({"id": 2}).result() == {"id": 2, "details": True}
+    loader.shutdown()
+
+
+def test_invalidate_forgets_details():
+    loader = DetailLoader(fetch, key="code")
+    loader.load({"code": "a"}).result()
+    loader.invalidate(["a"])
+    assert loader.get({"code": "a"}) is None
+    loader.shutdown()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+
+import itkdb
+import pytest
+
+from itkdb_browser.download import Downloader
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, status_code: int = 200):
+        self.body = body
+        self.status_code = status_code
+        self.headers = {"content-length": str(len(body))}
+
+    def iter_content(self, chunk_size: int):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start : start + chunk_size]
+
+    def close(self) -> None:
+        pass
+
+
+class FakeClient:
+    def get(self, url, json):
+        assert url == "getComponent"
+        return {
+            "code": json["component"],
+            "attachments": [{"code": "att", "filename": "data.txt", "type": "file"}],
+        }
+
+
+@pytest.fixture()
+def body():
+    return b"0123456789" * 10
+
+
+@pytest.fixture()
+def requests_made(monkeypatch, body):
+    requests_made = []
+
+    def request(_client, method, url, **kwargs):
+        requests_made.append((method, url, kwargs))
+        if "Range" in kwargs["headers"]:
+            offset = int(kwargs["headers"]["Range"][len("bytes=") : -1])
+            return FakeResponse(body[offset:], status_code=206)
+        return FakeResponse(body)
+
+    monkeypatch.setattr(itkdb.core.Session, "request", request)
+    return requests_made
+
+
+def test_download(tmp_path, body, requests_made):
+    progress = Downloader(FakeClient(), tmp_path, chunk_size=7).download(["abc"])
+
+    assert not progress.failures
+    assert progress.components_done == progress.files_done == 1
+    assert progress.bytes_done == progress.bytes_total == len(body)
+    assert (
+        json.loads((tmp_path / "abc" / "component.json").read_text())["code"] == "abc"
+    )
+    assert (tmp_path / "abc" / "att_data.txt").read_bytes() == body
+    assert requests_made[0][2]["json"] == {"component": "abc", "code": "att"}
+
+
+def test_download_resumes_partial_transfer(tmp_path, body, requests_made):
+    (tmp_path / "abc").mkdir()
+    (tmp_path / "abc" / "att_data.txt.part").write_bytes(body[:42])
+
+    progress = Downloader(FakeClient(), tmp_path).download(["abc"])
+
+    assert requests_made[0][2]["headers"] == {"Range": "bytes=42-"}
+    assert progress.bytes_done == progress.bytes_total == len(body)
+    assert progress.bytes_transferred == len(body[42:])
+    assert (tmp_path / "abc" / "att_data.txt").read_bytes() == body
+    assert not (tmp_path / "abc" / "att_data.txt.part").exists()
+
+
+def test_download_skips_existing_files(tmp_path, body, requests_made):
+    (tmp_path / "abc").mkdir()
+    (tmp_path / "abc" / "att_data.txt").write_bytes(body)
+
+    progress = Downloader(FakeClient(), tmp_path).download(["abc"])
+
+    assert not requests_made
+    assert progress.bytes_done == progress.bytes_total == len(body)
+    assert progress.bytes_transferred == 0
+    assert progress.throughput == 0
+
+
+def test_download_records_bad_attachments(tmp_path, requests_made):
+    class BadAttachmentClient:
+        def get(self, url, json):
+            assert url == "getComponent"
+            return {"code": json["component"], "attachments": [{"type": "eos"}]}
+
+    progress = Downloader(BadAttachmentClient(), tmp_path).download(["abc"])
+
+    assert not requests_made
+    assert progress.components_done == 1
+    assert [name for name, _ in progress.failures] == ["abc/?"]
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from textual.app import App, ComposeResult
+
+from itkdb_browser.live_list_view import (
+    DetailedLiveListView,
+    LiveListView,
+    diff_by_key,
+)
+
+
+def test_diff_by_key():
+    old = [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}, {"id": 3, "name": "c"}]
+    new = [{"id": 1, "name": "a"}, {"id": 2, "name": "B"}, {"id": 4, "name": "d"}]
+    delta = diff_by_key(old, new)
+    assert delta.added == {4: {"id": 4, "name": "d"}}
+    assert delta.removed == {3: {"id": 3, "name": "c"}}
+    assert delta.changed == {2: {"id": 2, "name": "B"}}
+    assert delta
+
+
+def test_diff_by_key_unchanged():
+    items = [{"code": "x", "name": "a"}]
+    assert not diff_by_key(items, list(items), key="code")
+
+
+def test_fetch_hooks_must_be_implemented():
+    with pytest.raises(NotImplementedError, match="LiveListView must implement"):
+        LiveListView().fetch_items()
+    with pytest.raises(NotImplementedError, match="must implement fetch_details"):
+        DetailedLiveListView().fetch_details({"id": 1})
+
+
+class StaticListView(LiveListView):
+    def fetch_items(self):
+        return []
+
+
+class LiveListApp(App[None]):
+    def compose(self) -> ComposeResult:
+        yield StaticListView()
+
+
+def test_patch_items_keeps_highlighted_row():
+    async def run() -> None:
+        app = LiveListApp()
+        async with app.run_test() as pilot:
+            list_view = app.query_one(StaticListView)
+            await list_view.patch_items(
+                [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}, {"id": 3, "name": "c"}]
+            )
+            list_view.index = 1
+            rows = list(list_view.children)
+
+            await list_view.patch_items(
+                [
+                    {"id": 0, "name": "0"},
+                    {"id": 2, "name": "b"},
+                    {"id": 3, "name": "cc"},
+                ]
+            )
+            await pilot.pause()
+
+            assert [item["id"] for item in list_view.items] == [0, 2, 3]
+            assert list_view.highlighted_child is rows[1]
+            assert list_view.children[2] is rows[2]
+            assert rows[2].has_class("-changed")
+
+    asyncio.run(run())
+
+
+class DetailedListView(DetailedLiveListView):
+    def fetch_items(self):
+        return []
+
+    def fetch_details(self, item):
+        return {**item, "details": True}
+
+
+async def wait_for_loaded(pilot, app, predicate) -> None:
+    for _ in range(100):
+        if app.loaded and predicate(app.loaded[-1]):
+            return
+        await pilot.pause(0.01)
+
+
+class DetailedListApp(App[None]):
+    def __init__(self) -> None:
+        super().__init__()
+        self.loaded: list[DetailedLiveListView.DetailsLoaded] = []
+
+    def compose(self) -> ComposeResult:
+        yield DetailedListView()
+
+    def on_detailed_live_list_view_details_loaded(
+        self, message: DetailedLiveListView.DetailsLoaded
+    ) -> None:
+        self.loaded.append(message)
+
+
+def test_highlight_loads_details_of_neighbours():
+    async def run() -> None:
+        app = DetailedListApp()
+        async with app.run_test() as pilot:
+            list_view = app.query_one(DetailedListView)
+            await list_view.patch_items(
+                [{"id": key, "name": f"item {key}"} for key in range(5)]
+            )
+            list_view.index = 1
+            for _ in range(100):
+                if {"id": 4} in list_view.details and app.loaded:
+                    break
+                await pilot.pause(0.01)
+
+            assert app.loaded[-1].item is list_view.highlighted_child
+            assert app.loaded[-1].details == {
+                "id": 1,
+                "name": "item 1",
+                "details": True,
+            }
+            assert {"id": 4} in list_view.details
+
+    asyncio.run(run())
+
+
+def test_patch_reloads_details_of_changed_highlighted_row():
+    async def run() -> None:
+        app = DetailedListApp()
+        async with app.run_test() as pilot:
+            list_view = app.query_one(DetailedListView)
+            await list_view.patch_items(
+                [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+            )
+            list_view.index = 0
+            await wait_for_loaded(
+                pilot, app, lambda message: message.details["name"] == "a"
+            )
+
+            await list_view.patch_items(
+                [{"id": 1, "name": "A"}, {"id": 2, "name": "b"}]
+            )
+            await wait_for_loaded(
+                pilot, app, lambda message: message.details["name"] == "A"
+            )
+
+            assert app.loaded[-1].item is list_view.highlighted_child
+            assert app.loaded[-1].details == {"id": 1, "name": "A", "details": True}
+
+    asyncio.run(run())
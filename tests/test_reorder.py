@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import pytest
+
+from itkdb_browser.reorder import (
+    SpecError,
+    apply_reorders,
+    build_payload,
+    plan_reorders,
+    read_spec,
+)
+
+
+def component_type(code, *stages):
+    return {
+        "id": f"id-{code}",
+        "code": code,
+        "project": {"code": "S"},
+        "stages": [
+            {"code": stage, "name": stage.lower(), "order": order, "testTypes": []}
+            for order, stage in enumerate(stages, start=1)
+        ],
+    }
+
+
+class FakeClient:
+    def __init__(self, *component_types):
+        self.component_types = component_types
+        self.posted = []
+
+    def get(self, url, json):
+        assert url == "listComponentTypes"
+        assert json == {"project": "S"}
+        return list(self.component_types)
+
+    def post(self, url, json):
+        assert url == "updateComponentType"
+        self.posted.append(json)
+
+
+def test_build_payload():
+    ctype = component_type("MODULE", "A", "B")
+    assert build_payload(ctype, reversed(ctype["stages"])) == {
+        "id": "id-MODULE",
+        "code": "MODULE",
+        "project": "S",
+        "stages": [
+            {"code": "B", "name": "b", "order": 1, "testTypes": []},
+            {"code": "A", "name": "a", "order": 2, "testTypes": []},
+        ],
+    }
+
+
+def test_read_spec(tmp_path):
+    spec = tmp_path / "spec.yaml"
+    spec.write_text(
+        """
+project: S
+stages: [B, A]
+componentTypes:
+  - MODULE
+  - code: SENSOR
+    stages: [A, B]
+"""
+    )
+    assert read_spec(spec) == [
+        {"project": "S", "code": "MODULE", "stages": ["B", "A"]},
+        {"project": "S", "code": "SENSOR", "stages": ["A", "B"]},
+    ]
+
+
+def test_read_spec_reports_all_errors(tmp_path):
+    spec = tmp_path / "spec.yaml"
+    spec.write_text("componentTypes: [MODULE, {code: SENSOR, project: S}, 3]")
+    with pytest.raises(SpecError) as excinfo:
+        read_spec(spec)
+    assert excinfo.value.errors == [
+        "componentTypes[1] (MODULE): no project given",
+        "componentTypes[1] (MODULE): expected a list of stage codes",
+        "componentTypes[2] (SENSOR): expected a list of stage codes",
+        "componentTypes[3]: expected a code or a mapping with a 'code'",
+    ]
+
+
+def test_read_spec_duplicates_need_a_project(tmp_path):
+    spec = tmp_path / "spec.yaml"
+    spec.write_text("stages: [A]\ncomponentTypes: [MODULE, MODULE, {code: MODULE}]")
+    with pytest.raises(SpecError) as excinfo:
+        read_spec(spec)
+    assert excinfo.value.errors == [
+        f"componentTypes[{position}] (MODULE): no project given"
+        for position in range(1, 4)
+    ]
+
+
+def test_read_spec_invalid_yaml(tmp_path):
+    spec = tmp_path / "spec.yaml"
+    spec.write_text("componentTypes: [MODULE")
+    with pytest.raises(SpecError, match="not valid YAML"):
+        read_spec(spec)
+
+
+def test_plan_and_apply_only_changed():
+    client = FakeClient(
+        component_type("MODULE", "A", "B"), component_type("SENSOR", "A", "B")
+    )
+    plans = plan_reorders(
+        client,
+        [
+            {"project": "S", "code": "MODULE", "stages": ["B", "A"]},
+            {"project": "S", "code": "SENSOR", "stages": ["A", "B"]},
+        ],
+    )
+
+    dry_run = apply_reorders(client, plans, dry_run=True)
+    assert [entry["status"] for entry in dry_run] == ["dry-run", "unchanged"]
+    assert not client.posted
+
+    report = apply_reorders(client, plans)
+    assert [entry["status"] for entry in report] == ["updated", "unchanged"]
+    assert report[0]["changes"] == [
+        {"code": "B", "name": "b", "from": 2, "to": 1},
+        {"code": "A", "name": "a", "from": 1, "to": 2},
+    ]
+    assert [payload["code"] for payload in client.posted] == ["MODULE"]
+
+
+def test_apply_records_failures():
+    class FailingClient(FakeClient):
+        def post(self, _url, json):
+            raise ConnectionError(json["code"])
+
+    client = FailingClient(component_type("MODULE", "A", "B"))
+    plans = plan_reorders(
+        client, [{"project": "S", "code": "MODULE", "stages": ["B", "A"]}]
+    )
+    report = apply_reorders(client, plans)
+    assert [(entry["status"], entry["error"]) for entry in report] == [
+        ("failed", "MODULE")
+    ]
+
+
+def test_plan_validates_all_entries():
+    client = FakeClient(component_type("MODULE", "A", "B"))
+    with pytest.raises(SpecError) as excinfo:
+        plan_reorders(
+            client,
+            [
+                {"project": "S", "code": "MODULE", "stages": ["B", "C"]},
+                {"project": "S", "code": "SENSOR", "stages": ["A"]},
+            ],
+        )
+    assert excinfo.value.errors == [
+        "S/MODULE: unknown stages C",
+        "S/MODULE: stages missing from the spec A",
+        "S/SENSOR: no such component type",
+    ]
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from itkdb_browser.stage_compare import StageAlignment, stage_test_types
+
+
+def component_type(identifier, *codes):
+    return {
+        "id": identifier,
+        "code": identifier.upper(),
+        "stages": [
+            {"code": code, "name": code.lower(), "order": order, "testTypes": []}
+            for order, code in enumerate(codes, start=1)
+        ],
+    }
+
+
+def aligned(alignment):
+    return [
+        (code, tuple(stage and stage["order"] for stage in cells))
+        for code, cells in alignment.rows
+    ]
+
+
+def test_alignment_matches_shared_stages():
+    alignment = StageAlignment()
+    alignment.add(component_type("a", "A", "B", "C"))
+    alignment.add(component_type("b", "A", "X", "C"))
+
+    assert aligned(alignment) == [
+        ("A", (1, 1)),
+        ("B", (2, None)),
+        ("X", (None, 2)),
+        ("C", (3, 3)),
+    ]
+
+
+def test_alignment_update_and_remove():
+    alignment = StageAlignment()
+    alignment.add(component_type("a", "A", "B"))
+    alignment.add(component_type("b", "B", "C"))
+    alignment.add(component_type("c", "A", "C"))
+
+    assert alignment.update(component_type("b", "A", "B", "C"))
+    assert aligned(alignment) == [
+        ("A", (1, 1, 1)),
+        ("B", (2, 2, None)),
+        ("C", (None, 3, 2)),
+    ]
+
+    alignment.remove({"id": "a"})
+    assert {"id": "a"} not in alignment
+    assert aligned(alignment) == [("A", (1, 1)), ("B", (2, None)), ("C", (3, 2))]
+
+
+def test_alignment_update_skips_unchanged_stages():
+    alignment = StageAlignment()
+    alignment.add(component_type("a", "A", "B"))
+    alignment.add(component_type("b", "B", "C"))
+    rows = alignment.rows
+
+    details = {**component_type("a", "A", "B"), "name": "details"}
+    assert not alignment.update(details)
+    assert not alignment.update(details)
+    assert not alignment.update(component_type("x", "A"))
+    assert alignment.rows is rows
+    assert alignment.component_types[0] is details
+
+
+def test_stage_test_types():
+    assert stage_test_types({"testTypes": ["IV"]}) == ["IV"]
+    assert stage_test_types({"testTypes": [{"testType": {"code": "IV"}}]}) == ["IV"]
+    assert stage_test_types({"testTypes": None}) == []
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from textual.app import App
+from textual.widgets import Button, Input, RichLog
+
+from itkdb_browser.tui import (
+    ComponentTypeList,
+    DownloadScreen,
+    StageReorderScreen,
+    StagesListView,
+)
+
+
+def component_type(*stages):
+    return {
+        "id": "id-MODULE",
+        "code": "MODULE",
+        "name": "Module",
+        "project": {"code": "S"},
+        "stages": [
+            {"code": stage, "name": stage.lower(), "order": order, "testTypes": []}
+            for order, stage in enumerate(stages, start=1)
+        ],
+    }
+
+
+class FakeClient:
+    def __init__(self, *component_types):
+        self.component_types = list(component_types)
+
+    def get(self, url, json):
+        if url == "listComponentTypes":
+            return list(self.component_types)
+        assert url == "getComponentType"
+        return next(
+            ctype for ctype in self.component_types if ctype["id"] == json["id"]
+        )
+
+
+class ScreenApp(App[None]):
+    def __init__(self, screen, client) -> None:
+        super().__init__()
+        self.test_screen = screen
+        self.client = client
+        self.user = {"preferences": {"defaultProject": "S"}}
+        self.projects = []
+        self.refresh_interval = 0
+
+    def on_mount(self) -> None:
+        self.push_screen(self.test_screen)
+
+
+@pytest.fixture(autouse=True)
+def _component_type_cache(monkeypatch):
+    monkeypatch.setattr(ComponentTypeList, "_component_types", {})
+
+
+def log_text(log: RichLog) -> str:
+    return "\n".join(line.text for line in log.lines)
+
+
+async def wait_for_log(pilot, log: RichLog) -> None:
+    for _ in range(100):
+        if log.lines:
+            return
+        await pilot.pause(0.01)
+
+
+def test_reorder_warns_about_remote_changes():
+    async def run() -> None:
+        client = FakeClient(component_type("A", "B", "C"))
+        app = ScreenApp(StageReorderScreen(), client)
+        async with app.run_test() as pilot:
+            ctype_list = app.screen.query_one(ComponentTypeList)
+            stages_lv = app.screen.query_one(StagesListView)
+            ctype_list.focus()
+            await pilot.press("enter")
+            await pilot.pause()
+            assert [child.value["code"] for child in stages_lv.children] == [
+                "A",
+                "B",
+                "C",
+            ]
+
+            # reorder locally, then change the stages remotely and refresh
+            stages_lv.move_child(stages_lv.children[2], before=0)
+            assert stages_lv.has_pending_changes
+            client.component_types = [component_type("B", "A", "C")]
+            await pilot.press("r")
+
+            log = app.screen.query_one(RichLog)
+            await wait_for_log(pilot, log)
+
+            assert "changed remotely" in log_text(log)
+            assert [child.value["code"] for child in stages_lv.children] == [
+                "C",
+                "A",
+                "B",
+            ]
+
+    asyncio.run(run())
+
+
+class DownloadClient:
+    def get(self, url, json):
+        if url == "listComponents":
+            msg = "listComponents is unavailable"
+            raise RuntimeError(msg)
+        assert url == "getComponent"
+        return {"code": json["component"], "attachments": []}
+
+
+def start_download(app, **inputs):
+    for name, value in inputs.items():
+        app.screen.query_one(f"#{name}", Input).value = value
+    app.screen.query_one("#start", Button).press()
+
+
+def test_download_reports_into_log(tmp_path):
+    async def run() -> None:
+        app = ScreenApp(DownloadScreen(), DownloadClient())
+        async with app.run_test() as pilot:
+            start_download(app, components="abc", output=str(tmp_path))
+            log = app.screen.query_one(RichLog)
+            await wait_for_log(pilot, log)
+
+            assert "Downloaded into" in log_text(log)
+            assert (tmp_path / "abc" / "component.json").exists()
+
+    asyncio.run(run())
+
+
+def test_download_worker_error_is_logged(tmp_path):
+    async def run() -> None:
+        app = ScreenApp(DownloadScreen(), DownloadClient())
+        async with app.run_test() as pilot:
+            start_download(app, component_type="MODULE", output=str(tmp_path))
+            log = app.screen.query_one(RichLog)
+            await wait_for_log(pilot, log)
+
+            assert "listComponents is unavailable" in log_text(log)
+
+    asyncio.run(run())